@@ -85,17 +85,17 @@ class DataIngestionService {
     }
   }
 
-  async ingestCarbonCreditData() {
+  async ingestCarbonCreditData({ marketData = null, useUnfccc = true } = {}) {
     try {
       console.log('Starting carbon credit data ingestion');
 
       let carbonData = [];
 
-      // Try to get real data from UNFCCC API first
-      if (this.unfcccService && this.unfcccService.isAvailable) {
+      // Try to get real data from UNFCCC API first, reusing market data the caller already fetched
+      if (marketData || (useUnfccc && this.unfcccService && this.unfcccService.isAvailable)) {
         try {
           console.log('Attempting to fetch UNFCCC emissions data...');
-          const unfcccData = await this.getUNFCCCCarbonData();
+          const unfcccData = await this.getUNFCCCCarbonData(marketData);
           if (unfcccData && unfcccData.length > 0) {
             carbonData = unfcccData;
             console.log(`Successfully fetched ${carbonData.length} records from UNFCCC API`);
@@ -120,14 +120,16 @@ class DataIngestionService {
     }
   }
 
-  async getUNFCCCCarbonData() {
+  async getUNFCCCCarbonData(marketData = null) {
     try {
-      if (!this.unfcccService) {
-        throw new Error('UNFCCC service not available');
-      }
+      if (!marketData) {
+        if (!this.unfcccService) {
+          throw new Error('UNFCCC service not available');
+        }
 
-      // Get carbon credit market data from UNFCCC
-      const marketData = await this.unfcccService.getCarbonCreditMarketData();
+        // Get carbon credit market data from UNFCCC
+        marketData = await this.unfcccService.getCarbonCreditMarketData();
+      }
 
       if (marketData.error) {
         throw new Error(marketData.error);
@@ -0,0 +1,100 @@
+"""
+Tests for incremental carbon credit recomputation in the UNFCCC service
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from unfcccService import UNFCCCService
+
+
+def _emissions(recent, previous):
+    return [{'year': 2020, 'emissions': recent}, {'year': 2019, 'emissions': previous}]
+
+
+@pytest.fixture
+def emissions():
+    return {'USA': _emissions(1000, 1200), 'CHN': _emissions(5, 50)}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch, emissions):
+    monkeypatch.setenv('UNFCCC_CREDIT_STORE_PATH', str(tmp_path / 'store.json'))
+    svc = UNFCCCService()
+    svc.is_available = lambda: True
+    svc.calls = []
+
+    def get_emissions_data(party_code, gases=None, limit=1000):
+        svc.calls.append(party_code)
+        if party_code not in emissions:
+            return {'party_code': party_code, 'data': []}
+        if emissions[party_code] is None:
+            return {'error': 'API unavailable', 'party_code': party_code}
+        return {'party_code': party_code, 'data': emissions[party_code]}
+
+    svc.get_emissions_data = get_emissions_data
+    return svc
+
+
+def test_repeat_call_with_previous_version_is_unchanged(service):
+    first = service.get_carbon_credit_market_update()
+    assert first['changed'] is True
+    assert sorted(r['location'] for r in first['data']) == ['CHN', 'USA']
+
+    second = service.get_carbon_credit_market_update(first['version'])
+    assert second['changed'] is False
+    assert second['version'] == first['version']
+    assert second['unchanged_since'] == first['unchanged_since']
+    assert second['recomputed'] == []
+    assert 'data' not in second
+
+
+def test_only_changed_party_is_recomputed(service, emissions):
+    first = service.get_carbon_credit_market_update()
+    usa_record = next(r for r in first['data'] if r['location'] == 'USA')
+
+    emissions['CHN'] = _emissions(5, 80)
+    second = service.get_carbon_credit_market_update(first['version'])
+
+    assert second['changed'] is True
+    assert second['recomputed'] == ['CHN']
+    assert next(r for r in second['data'] if r['location'] == 'USA') == usa_record
+
+
+def test_failed_fetch_keeps_previous_record(service, emissions):
+    first = service.get_carbon_credit_market_update()
+    usa_record = next(r for r in first['data'] if r['location'] == 'USA')
+
+    emissions['USA'] = None
+    second = service.get_carbon_credit_market_update()
+
+    assert second['version'] == first['version']
+    assert second['recomputed'] == []
+    assert usa_record in second['data']
+
+
+def test_store_without_unchanged_since_is_accepted(service):
+    first = service.get_carbon_credit_market_update()
+    with open(service.credit_store_path) as f:
+        store = json.load(f)
+    del store['unchanged_since']
+    with open(service.credit_store_path, 'w') as f:
+        json.dump(store, f)
+
+    second = service.get_carbon_credit_market_update(first['version'])
+    assert 'error' not in second
+    assert second['changed'] is False
+
+
+def test_parties_no_longer_served_are_dropped(service, monkeypatch):
+    first = service.get_carbon_credit_market_update()
+    monkeypatch.setattr(UNFCCCService, 'CREDIT_PARTIES', ['USA'])
+
+    second = service.get_carbon_credit_market_update(first['version'])
+    assert second['changed'] is True
+    assert [r['location'] for r in second['data']] == ['USA']
+    with open(service.credit_store_path) as f:
+        assert list(json.load(f)['parties']) == ['USA']
@@ -7,6 +7,8 @@ This service provides access to UNFCCC greenhouse gas emissions data
 import os
 import sys
 import json
+import hashlib
+import tempfile
 import pandas as pd
 from typing import Dict, List, Optional, Any
 import logging
@@ -27,8 +29,16 @@ except ImportError:
 class UNFCCCService:
     """Service for accessing UNFCCC greenhouse gas emissions data"""
     
+    # Major countries used to calculate carbon credit potential
+    CREDIT_PARTIES = ['USA', 'CHN', 'IND', 'RUS', 'JPN', 'DEU', 'GBR', 'FRA', 'ITA', 'CAN']
+    
     def __init__(self):
         self.api_key = os.getenv('UNFCCC_DI_API_KEY')
+        # Persisted table of derived carbon credit records, keyed by party
+        self.credit_store_path = os.getenv(
+            'UNFCCC_CREDIT_STORE_PATH',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'unfccc_credit_store.json')
+        )
         self.base_url = 'https://di.unfccc.int/api/'
         self.reader = None
         self.zenodo_reader = None
@@ -164,78 +174,176 @@ class UNFCCCService:
             logging.error(f"Error querying data for {party_code}: {e}")
             return {"error": str(e), "party_code": party_code, "source": "error"}
     
-    def get_carbon_credit_market_data(self) -> List[Dict[str, Any]]:
-        """Get carbon credit market data from UNFCCC emissions data"""
+    def _hash_emissions_slice(self, records: List[Dict[str, Any]]) -> str:
+        """Content hash of a party's emissions records, independent of row order"""
+        rows = sorted(json.dumps(record, sort_keys=True, default=str) for record in records)
+        return hashlib.sha256('\n'.join(rows).encode('utf-8')).hexdigest()
+    
+    def _load_credit_store(self) -> Dict[str, Any]:
+        """Load the persisted table of derived carbon credit records"""
         try:
-            if not self.is_available():
-                return []
-            
-            # Get emissions data for major countries to calculate carbon credit potential
-            major_countries = ['USA', 'CHN', 'IND', 'RUS', 'JPN', 'DEU', 'GBR', 'FRA', 'ITA', 'CAN']
-            carbon_credits = []
-            
-            for country in major_countries:
-                try:
-                    # Get recent emissions data (last 5 years)
-                    emissions_data = self.get_emissions_data(country, 'CO2', 100)
-                    
-                    if 'data' in emissions_data and emissions_data['data']:
-                        # Calculate carbon credit potential based on emissions reduction
-                        country_data = emissions_data['data']
-                        
-                        # Find the most recent year with data
-                        recent_year = max([d.get('year', 0) for d in country_data if d.get('year')])
-                        
-                        if recent_year:
-                            # Get emissions for recent year and previous year
-                            recent_emissions = next((d.get('emissions', 0) for d in country_data if d.get('year') == recent_year), 0)
-                            prev_year = recent_year - 1
-                            prev_emissions = next((d.get('emissions', 0) for d in country_data if d.get('year') == prev_year), 0)
-                            
-                            if recent_emissions and prev_emissions:
-                                # Calculate reduction and potential credits
-                                reduction = prev_emissions - recent_emissions
-                                if reduction > 0:
-                                    # Convert to carbon credits (1 ton CO2 = 1 carbon credit)
-                                    potential_credits = int(reduction)
-                                    
-                                    # Estimate market price based on reduction amount
-                                    base_price = 15.0  # Base price per credit
-                                    price_multiplier = min(2.0, 1 + (reduction / 1000))  # Price increases with larger reductions
-                                    estimated_price = round(base_price * price_multiplier, 2)
-                                    
-                                    carbon_credits.append({
-                                        'name': f'{country} Emissions Reduction Credits',
-                                        'standard': 'UNFCCC Verified',
-                                        'asset_id': f'UNFCCC-{country}-{recent_year}',
-                                        'current_price': estimated_price,
-                                        'price_change': round((reduction / prev_emissions) * 100, 2),
-                                        'volume_24h': potential_credits,
-                                        'market_cap': potential_credits * estimated_price,
-                                        'total_supply': potential_credits,
-                                        'location': country,
-                                        'project_type': 'Emissions Reduction',
-                                        'last_updated': pd.Timestamp.now().isoformat(),
-                                        'balance': potential_credits,
-                                        'value': potential_credits * estimated_price,
-                                        'data_source': 'unfccc_api',
-                                        'emissions_reduction': reduction,
-                                        'year': recent_year
-                                    })
-                except Exception as e:
-                    logging.warning(f"Failed to get data for {country}: {e}")
+            with open(self.credit_store_path, 'r') as f:
+                store = json.load(f)
+            if isinstance(store, dict) and isinstance(store.get('parties'), dict):
+                store.setdefault('version', None)
+                store.setdefault('unchanged_since', None)
+                return store
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable carbon credit store {self.credit_store_path}: {e}")
+        return {"version": None, "unchanged_since": None, "parties": {}}
+    
+    def _save_credit_store(self, store: Dict[str, Any]) -> None:
+        """Atomically persist the carbon credit store"""
+        tmp_path = None
+        try:
+            # Unique temp file per writer, since several Node callers may run this script concurrently
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.credit_store_path)), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(store, f, default=str)
+            os.replace(tmp_path, self.credit_store_path)
+        except Exception as e:
+            logging.warning(f"Failed to persist carbon credit store: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _derive_carbon_credit(self, country: str, country_data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Derive a carbon credit record from a party's emissions records"""
+        # Find the most recent year with data
+        recent_year = max([d.get('year', 0) for d in country_data if d.get('year')], default=0)
+        if not recent_year:
+            return None
+        
+        # Get emissions for recent year and previous year
+        recent_emissions = next((d.get('emissions', 0) for d in country_data if d.get('year') == recent_year), 0)
+        prev_year = recent_year - 1
+        prev_emissions = next((d.get('emissions', 0) for d in country_data if d.get('year') == prev_year), 0)
+        
+        if not (recent_emissions and prev_emissions):
+            return None
+        
+        # Calculate reduction and potential credits
+        reduction = prev_emissions - recent_emissions
+        if reduction <= 0:
+            return None
+        
+        # Convert to carbon credits (1 ton CO2 = 1 carbon credit)
+        potential_credits = int(reduction)
+        
+        # Estimate market price based on reduction amount
+        base_price = 15.0  # Base price per credit
+        price_multiplier = min(2.0, 1 + (reduction / 1000))  # Price increases with larger reductions
+        estimated_price = round(base_price * price_multiplier, 2)
+        
+        return {
+            'name': f'{country} Emissions Reduction Credits',
+            'standard': 'UNFCCC Verified',
+            'asset_id': f'UNFCCC-{country}-{recent_year}',
+            'current_price': estimated_price,
+            'price_change': round((reduction / prev_emissions) * 100, 2),
+            'volume_24h': potential_credits,
+            'market_cap': potential_credits * estimated_price,
+            'total_supply': potential_credits,
+            'location': country,
+            'project_type': 'Emissions Reduction',
+            'last_updated': pd.Timestamp.now().isoformat(),
+            'balance': potential_credits,
+            'value': potential_credits * estimated_price,
+            'data_source': 'unfccc_api',
+            'emissions_reduction': reduction,
+            'year': recent_year
+        }
+    
+    def _refresh_credit_store(self) -> Dict[str, Any]:
+        """
+        Re-derive carbon credits only for parties whose emissions data changed
+        
+        Returns:
+            The persisted store plus the list of parties recomputed in this call
+        """
+        store = self._load_credit_store()
+        # Drop parties that are no longer served so they don't affect the version
+        parties = {c: p for c, p in store['parties'].items() if c in self.CREDIT_PARTIES}
+        store['parties'] = parties
+        recomputed = []
+        
+        for country in self.CREDIT_PARTIES:
+            try:
+                # Get recent emissions data (last 5 years)
+                emissions_data = self.get_emissions_data(country, 'CO2', 100)
+                if 'error' in emissions_data:
+                    # Keep the previously derived record rather than dropping the party
+                    logging.warning(f"Failed to get data for {country}: {emissions_data['error']}")
                     continue
-            
-            if carbon_credits:
-                logging.info(f"Generated {len(carbon_credits)} carbon credit records from UNFCCC data")
-                return carbon_credits
-            else:
-                logging.info("No carbon credit data could be generated from UNFCCC emissions data")
-                return []
                 
+                country_data = emissions_data.get('data') or []
+                data_hash = self._hash_emissions_slice(country_data)
+                if parties.get(country, {}).get('hash') == data_hash:
+                    continue
+                
+                parties[country] = {
+                    'hash': data_hash,
+                    'record': self._derive_carbon_credit(country, country_data) if country_data else None,
+                    'computed_at': pd.Timestamp.now().isoformat()
+                }
+                recomputed.append(country)
+            except Exception as e:
+                logging.warning(f"Failed to get data for {country}: {e}")
+                continue
+        
+        version = hashlib.sha256(
+            json.dumps({c: p.get('hash') for c, p in parties.items()}, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        if version != store.get('version'):
+            store['version'] = version
+            store['unchanged_since'] = pd.Timestamp.now().isoformat()
+            self._save_credit_store(store)
+        
+        return {**store, 'recomputed': recomputed}
+    
+    def get_carbon_credit_market_update(self, since_version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get carbon credit market data only if it changed since a known version
+        
+        Args:
+            since_version: Version returned by a previous call, if any
+        
+        Returns:
+            Dictionary with the current version and, when it differs from
+            since_version, the full list of carbon credit records
+        """
+        if not self.is_available():
+            return {"version": None, "changed": True, "data": [], "recomputed": []}
+        
+        try:
+            store = self._refresh_credit_store()
+            changed = store['version'] != since_version
+            result = {
+                "version": store['version'],
+                "changed": changed,
+                "unchanged_since": store['unchanged_since'],
+                "recomputed": store['recomputed']
+            }
+            if changed:
+                result["data"] = [
+                    store['parties'][country]['record']
+                    for country in self.CREDIT_PARTIES
+                    if store['parties'].get(country, {}).get('record')
+                ]
+                logging.info(f"Generated {len(result['data'])} carbon credit records from UNFCCC data "
+                             f"({len(store['recomputed'])} parties recomputed)")
+            return result
         except Exception as e:
-            logging.error(f"Error getting carbon credit market data: {e}")
-            return []
+            logging.error(f"Error getting carbon credit market update: {e}")
+            return {"error": str(e), "version": None, "changed": True, "data": [], "recomputed": []}
+    
+    def get_carbon_credit_market_data(self) -> List[Dict[str, Any]]:
+        """Get carbon credit market data from UNFCCC emissions data"""
+        update = self.get_carbon_credit_market_update()
+        if not update.get('data'):
+            logging.info("No carbon credit data could be generated from UNFCCC emissions data")
+        return update.get('data', [])
     
     def get_service_status(self) -> Dict[str, Any]:
         """Get the status of the UNFCCC service"""
@@ -290,6 +398,15 @@ def main():
             result = unfccc_service.get_emissions_data(party_code, gases, limit)
         elif args.function == 'get_carbon_credit_market_data':
             result = unfccc_service.get_carbon_credit_market_data()
+        elif args.function == 'get_carbon_credit_market_update':
+            since_version = None
+            if args.args:
+                try:
+                    func_args = json.loads(args.args)
+                    since_version = func_args[0] if len(func_args) > 0 else None
+                except json.JSONDecodeError:
+                    since_version = None
+            result = unfccc_service.get_carbon_credit_market_update(since_version)
         else:
             result = {"error": f"Unknown function: {args.function}"}
         
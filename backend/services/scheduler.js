@@ -2,6 +2,8 @@ const cron = require('node-cron');
 const { logger } = require('../middleware/errorHandler');
 
 let scheduledJobs = new Map();
+// UNFCCC carbon credit data version last ingested by the hourly job
+let lastIngestedCarbonVersion = null;
 
 /**
  * Initialize scheduled tasks
@@ -194,8 +196,28 @@ const ingestStockData = async () => {
 
 const ingestCarbonData = async () => {
   try {
+    // Skip ingestion when the UNFCCC emissions data has not changed since the last ingested
+    // version; without UNFCCC, fall through to the cheap mock-data path
+    const options = { useUnfccc: false };
+    let version = null;
+    const unfcccService = require('./unfcccNodeService');
+    if (unfcccService.isAvailable || await unfcccService.checkAvailability()) {
+      try {
+        const update = await unfcccService.getCarbonCreditMarketUpdate(lastIngestedCarbonVersion);
+        if (update.version && !update.changed) {
+          logger.info(`Carbon credit data unchanged since ${update.unchanged_since}, skipping ingestion`);
+          return;
+        }
+        options.marketData = update.data;
+        version = update.version;
+      } catch (e) {
+        logger.debug('Carbon data change detection unavailable:', e.message);
+      }
+    }
+
     const ingestion = require('../data-ingestion/dataIngestion');
-    await ingestion.ingestCarbonCreditData();
+    await ingestion.ingestCarbonCreditData(options);
+    lastIngestedCarbonVersion = version;
   } catch (e) {
     logger.warn('Carbon data ingestion skipped:', e.message);
   }
@@ -285,6 +307,7 @@ const stopAllJobs = () => {
 
 module.exports = {
   initializeScheduler,
+  ingestCarbonData,
   addCustomJob,
   stopJob,
   getScheduledJobsStatus,
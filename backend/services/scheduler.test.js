@@ -0,0 +1,81 @@
+jest.mock('node-cron', () => ({ schedule: jest.fn() }));
+jest.mock('../middleware/errorHandler', () => ({
+  logger: { info: jest.fn(), warn: jest.fn(), error: jest.fn(), debug: jest.fn() }
+}));
+jest.mock('../data-ingestion/dataIngestion', () => ({ ingestCarbonCreditData: jest.fn() }));
+
+const unfcccService = require('./unfcccNodeService');
+const ingestion = require('../data-ingestion/dataIngestion');
+const { ingestCarbonData } = require('./scheduler');
+
+/**
+ * Fake get_carbon_credit_market_update: full records only when the caller's version is stale
+ */
+const python = { version: 'v1', records: { v1: [{ asset_id: 'UNFCCC-USA-2020' }] } };
+
+const fakePythonFunction = async (functionName, [sinceVersion]) => {
+  if (sinceVersion === python.version) {
+    return { version: python.version, changed: false, unchanged_since: '2026-01-01T00:00:00', recomputed: [] };
+  }
+  return { version: python.version, changed: true, data: python.records[python.version], recomputed: ['USA'] };
+};
+
+describe('scheduled carbon credit ingestion', () => {
+  beforeAll(() => {
+    unfcccService.isAvailable = true;
+    jest.spyOn(unfcccService, 'executePythonFunction').mockImplementation(fakePythonFunction);
+  });
+
+  beforeEach(() => {
+    ingestion.ingestCarbonCreditData.mockReset();
+    unfcccService.executePythonFunction.mockClear();
+  });
+
+  test('ingests changed data once and skips an unchanged version', async () => {
+    await ingestCarbonData();
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledTimes(1);
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledWith({
+      useUnfccc: false,
+      marketData: python.records.v1
+    });
+    expect(unfcccService.executePythonFunction).toHaveBeenCalledTimes(1);
+
+    await ingestCarbonData();
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledTimes(1);
+  });
+
+  test('a read between runs does not hide a change from the job', async () => {
+    python.version = 'v2';
+    python.records.v2 = [{ asset_id: 'UNFCCC-CHN-2020' }];
+
+    await expect(unfcccService.getCarbonCreditMarketData()).resolves.toEqual(python.records.v2);
+
+    await ingestCarbonData();
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledWith({
+      useUnfccc: false,
+      marketData: python.records.v2
+    });
+  });
+
+  test('a failed ingestion is retried on the next run', async () => {
+    python.version = 'v3';
+    python.records.v3 = [{ asset_id: 'UNFCCC-IND-2020' }];
+    ingestion.ingestCarbonCreditData.mockRejectedValueOnce(new Error('database unavailable'));
+
+    await ingestCarbonData();
+    await ingestCarbonData();
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledTimes(2);
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenLastCalledWith({
+      useUnfccc: false,
+      marketData: python.records.v3
+    });
+  });
+
+  test('falls back to mock data without refetching when change detection fails', async () => {
+    unfcccService.executePythonFunction.mockRejectedValueOnce(new Error('UNFCCC service failed'));
+
+    await ingestCarbonData();
+    expect(unfcccService.executePythonFunction).toHaveBeenCalledTimes(1);
+    expect(ingestion.ingestCarbonCreditData).toHaveBeenCalledWith({ useUnfccc: false });
+  });
+});
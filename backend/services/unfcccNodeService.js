@@ -11,6 +11,8 @@ class UNFCCCNodeService {
         this.isAvailable = false;
         this.lastCheck = null;
         this.checkInterval = 5 * 60 * 1000; // 5 minutes
+        this.carbonCreditVersion = null;
+        this.carbonCreditData = [];
     }
 
     /**
@@ -172,6 +174,22 @@ class UNFCCCNodeService {
         }
     }
 
+    /**
+     * Get carbon credit market data only if it changed since the given version
+     */
+    async getCarbonCreditMarketUpdate(sinceVersion = null) {
+        try {
+            const update = await this.executePythonFunction('get_carbon_credit_market_update', [sinceVersion]);
+            if (update.error) {
+                throw new Error(update.error);
+            }
+            return update;
+        } catch (error) {
+            logger.error('Failed to get carbon credit market update:', error.message);
+            throw error;
+        }
+    }
+
     /**
      * Get carbon credit market data from UNFCCC
      */
@@ -179,12 +197,16 @@ class UNFCCCNodeService {
         try {
             console.log('[UNFCCC] Attempting to fetch carbon credit market data...');
             
-            // Try to get real carbon credit data from UNFCCC
-            const carbonData = await this.executePythonFunction('get_carbon_credit_market_data');
+            // Only re-derived parties are recomputed; unchanged data reuses the cached records
+            const update = await this.getCarbonCreditMarketUpdate(this.carbonCreditVersion);
+            if (update.changed) {
+                this.carbonCreditVersion = update.version;
+                this.carbonCreditData = update.data || [];
+            }
             
-            if (carbonData && carbonData.length > 0) {
-                console.log(`[UNFCCC] Successfully fetched ${carbonData.length} carbon credit records`);
-                return carbonData;
+            if (this.carbonCreditData.length > 0) {
+                console.log(`[UNFCCC] Successfully fetched ${this.carbonCreditData.length} carbon credit records`);
+                return this.carbonCreditData;
             } else {
                 console.log('[UNFCCC] No carbon credit data available from UNFCCC');
                 return [];